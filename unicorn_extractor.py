@@ -1,17 +1,56 @@
 import pandas as pd
 from datetime import datetime
-import time
+import io
+import json
+import os
+import sys
 import psycopg2
-from sqlalchemy import create_engine, text
-import random
-import numpy as np # Import numpy for NaN handling
+from psycopg2.extras import execute_values
+from sqlalchemy import create_engine
 
 # --- Configuration ---
 CSV_FILE_PATH = "Unicorn_Companies.csv" # Make sure this file is in the same directory as your script
 
-# --- Automation Interval ---
-MIN_REFRESH_INTERVAL_SECONDS = 3600 * 24 # 24 hours
-MAX_REFRESH_INTERVAL_SECONDS = 3600 * 48 # 48 hours
+# Rows read, transformed and loaded at a time; bounds memory by chunk size instead of file size
+CSV_CHUNK_SIZE = 100_000
+
+# Declared up front so the CSV reader skips type inference for these columns.
+# The integer columns are read as text too: transform_unicorn_data() coerces them, turning bad cells into NA.
+CSV_DTYPES = {
+    'Company': 'string',
+    'Industry': 'string',
+    'Country': 'string',
+    'City': 'string',
+    'Select Inverstors': 'string',
+    'Financial Stage': 'string',
+    'Deal Terms': 'string',
+    'Portfolio Exits': 'string',
+    'Founded Year': 'string',
+    'Investors Count': 'string'
+}
+
+# CSV headers -> snake_case column names used in the warehouse
+COLUMN_MAPPING = {
+    'Company': 'company_name',
+    'Valuation ($B)': 'valuation_billion',
+    'Date Joined': 'date_joined_unicorn_club',
+    'Country': 'country',
+    'City': 'city',
+    'Industry': 'industry',
+    'Select Inverstors': 'select_investors', # Handles common typo
+    'Founded Year': 'founded_year',
+    'Total Raised': 'total_raised_million',
+    'Financial Stage': 'financial_stage',
+    'Investors Count': 'investors_count',
+    'Deal Terms': 'deal_terms',
+    'Portfolio Exits': 'portfolio_exits'
+}
+
+# Low-cardinality text columns kept as 'category' while the DataFrame is in memory
+CATEGORY_COLUMNS = ['industry', 'country', 'city', 'financial_stage']
+
+# Remembers the CSV modification time of the last successful load between scheduled runs
+STATE_FILE_PATH = "unicorn_etl_state.json"
 
 # --- Database Configuration ---
 DB_HOST = "localhost"
@@ -20,245 +59,323 @@ DB_USER = "postgres"
 DB_PASSWORD = "adi1234" # <<< !!! IMPORTANT: REPLACE THIS !!! >>>
 DB_PORT = "5432"
 
-# SQLAlchemy engine for Pandas to_sql
+# SQLAlchemy engine; every load phase borrows its psycopg2 connection.
+# Single writer: one pooled connection is reused by every phase and chunk of a run instead of reconnecting each time,
+# and pre-ping replaces it transparently if the server dropped it.
 engine_string = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-db_engine = create_engine(engine_string)
+db_engine = create_engine(engine_string, pool_size=1, max_overflow=0, pool_pre_ping=True)
+
+# --- SQL Statements ---
+# Built once at import; "VALUES %s" is expanded by psycopg2's execute_values into one multi-row statement.
+SQL_UPSERT_DATE = """
+    INSERT INTO dim_date (full_date, year, month, day, day_of_week, is_weekday)
+    VALUES %s
+    ON CONFLICT (full_date) DO UPDATE SET year = EXCLUDED.year
+    RETURNING full_date, date_key, (xmax = 0) AS inserted;
+"""
+
+SQL_SELECT_COMPANY_HASHES = "SELECT company_name, company_key, content_hash FROM dim_company"
+
+SQL_UPSERT_COMPANY = """
+    INSERT INTO dim_company (company_name, industry, country, city, founded_year, date_joined_unicorn_club, select_investors, content_hash)
+    VALUES %s
+    ON CONFLICT (company_name) DO UPDATE SET
+        industry = EXCLUDED.industry,
+        country = EXCLUDED.country,
+        city = EXCLUDED.city,
+        founded_year = EXCLUDED.founded_year,
+        date_joined_unicorn_club = EXCLUDED.date_joined_unicorn_club,
+        select_investors = EXCLUDED.select_investors,
+        content_hash = EXCLUDED.content_hash
+    RETURNING company_key, company_name, (xmax = 0) AS inserted;
+"""
+
+SQL_SNAPSHOT_EXISTS = "SELECT 1 FROM fact_unicorn_snapshot WHERE load_date_key = ANY(%s) LIMIT 1"
+
+SQL_UPSERT_FACT = """
+    INSERT INTO fact_unicorn_snapshot (load_date_key, company_key, valuation_billion, total_raised_million, financial_stage, investors_count, deal_terms, portfolio_exits)
+    VALUES %s
+    ON CONFLICT (load_date_key, company_key) DO UPDATE SET
+        valuation_billion = EXCLUDED.valuation_billion,
+        total_raised_million = EXCLUDED.total_raised_million,
+        financial_stage = EXCLUDED.financial_stage,
+        investors_count = EXCLUDED.investors_count,
+        deal_terms = EXCLUDED.deal_terms,
+        portfolio_exits = EXCLUDED.portfolio_exits;
+"""
+
+SQL_COPY_FACT = """
+    COPY fact_unicorn_snapshot (load_date_key, company_key, valuation_billion, total_raised_million, financial_stage, investors_count, deal_terms, portfolio_exits)
+    FROM STDIN WITH (FORMAT csv, NULL '\\N')
+"""
 
 # --- Helper function for cleaning currency values ---
-def clean_currency_value(val_str):
+def clean_currency_value(values):
     """
-    Cleans and converts currency strings (e.g., '$1.5B', '200M', 'None') to float (in millions).
-    Returns None for unparseable or 'None' values.
+    Cleans and converts a Series of currency strings (e.g., '$1.5B', '200M', 'None') to floats (in millions).
+    Works on the whole column at once; unparseable or 'None' values become NaN.
     """
-    if isinstance(val_str, str):
-        val_str = val_str.replace('$', '').replace(',', '').strip()
-        if val_str.lower() == 'none' or val_str == '': # Handle 'None' as string or empty string
-            return None
-        if 'B' in val_str: # Billions
-            val_str = val_str.replace('B', '')
-            try:
-                return float(val_str) * 1000 # Convert to millions for consistency
-            except ValueError:
-                return None
-        elif 'M' in val_str: # Millions
-            val_str = val_str.replace('M', '')
-            try:
-                return float(val_str)
-            except ValueError:
-                return None
-        else:
-            try:
-                return float(val_str) # Assume it's already a number
-            except ValueError:
-                return None
-    return val_str
-
-# --- Main Automation Loop ---
-while True:
-    current_wait_time = random.randint(MIN_REFRESH_INTERVAL_SECONDS, MAX_REFRESH_INTERVAL_SECONDS)
-    print(f"\n--- Starting data load cycle for Unicorns at {datetime.now()} ---")
+    values = values.astype('string').str.replace(r'[$,\s]', '', regex=True)
+    multiplier = pd.Series(1.0, index=values.index)
+    multiplier[values.str.endswith('B', na=False)] = 1000.0 # Convert billions to millions for consistency
+    values = values.str.rstrip('BM')
+    return pd.to_numeric(values, errors='coerce').astype('float64') * multiplier
+
+# --- Helper function for building psycopg2 rows ---
+def to_db_records(df):
+    """
+    Converts a DataFrame into a list of plain tuples (in column order) for execute_values.
+    psycopg2 only adapts plain Python values, so every NaN/NaT/pd.NA becomes None.
+    """
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+# --- Transformation ---
+def transform_unicorn_data(df_raw, load_date):
+    """
+    Renames and types one chunk of raw CSV columns and stamps every row with the cycle's load_date.
+    All converted columns are attached in a single assign() so the frame is only rebuilt once.
+    Missing values stay NaN/NaT/pd.NA here; they become None only when rows are built for psycopg2.
+    """
+    df = df_raw.rename(columns=COLUMN_MAPPING)
+    df = df[[col for col in COLUMN_MAPPING.values() if col in df.columns]]
+
+    converted = {}
+
+    # Numeric columns (for PostgreSQL NUMERIC)
+    for col_name in ['valuation_billion', 'total_raised_million']:
+        if col_name in df.columns:
+            converted[col_name] = clean_currency_value(df[col_name])
 
-    df_transformed = pd.DataFrame() # Initialize empty DataFrame
+    # Date columns (for PostgreSQL DATE)
+    for col_name in ['date_joined_unicorn_club']:
+        if col_name in df.columns:
+            converted[col_name] = pd.to_datetime(df[col_name], errors='coerce').dt.date
 
+    # Integer columns (for PostgreSQL INTEGER/SMALLINT), as nullable Int64
+    for col_name in ['founded_year', 'investors_count']:
+        if col_name in df.columns:
+            converted[col_name] = pd.to_numeric(df[col_name], errors='coerce').astype('Int64')
+
+    # String columns (for PostgreSQL VARCHAR) use the nullable 'string' dtype so missing values stay pd.NA
+    # (astype(str) would turn them into the literal text 'nan'). A no-op when CSV_DTYPES already applied it.
+    for col_name in ['company_name', 'select_investors', 'deal_terms', 'portfolio_exits']:
+        if col_name in df.columns:
+            converted[col_name] = df[col_name].astype('string')
+
+    for col_name in CATEGORY_COLUMNS:
+        if col_name in df.columns:
+            converted[col_name] = df[col_name].astype('category')
+
+    converted['load_date'] = load_date
+
+    return df.assign(**converted)
+
+# --- Helper functions for the load state file ---
+def read_last_loaded_mtime():
+    """
+    Returns the CSV modification time recorded by the last fully successful load, or None if there is none.
+    """
     try:
-        # --- 1. Load data from CSV ---
-        print(f"Loading data from {CSV_FILE_PATH}...")
-        df_raw = pd.read_csv(CSV_FILE_PATH)
-        
-        if df_raw.empty:
-            print("Error: CSV file is empty or could not be read.")
-            time.sleep(current_wait_time)
-            continue
-
-        # --- 2. Data Transformation ---
-        column_mapping = {
-            'Company': 'company_name',
-            'Valuation ($B)': 'valuation_billion',
-            'Date Joined': 'date_joined_unicorn_club',
-            'Country': 'country',
-            'City': 'city',
-            'Industry': 'industry',
-            'Select Inverstors': 'select_investors', # Handles common typo
-            'Founded Year': 'founded_year',
-            'Total Raised': 'total_raised_million',
-            'Financial Stage': 'financial_stage',
-            'Investors Count': 'investors_count',
-            'Deal Terms': 'deal_terms',
-            'Portfolio Exits': 'portfolio_exits'
-        }
-        
-        df_transformed = df_raw.rename(columns=column_mapping)
-        df_transformed = df_transformed[[col for col in column_mapping.values() if col in df_transformed.columns]]
-
-        # Numeric columns (for PostgreSQL NUMERIC)
-        for col_name in ['valuation_billion', 'total_raised_million']:
-            if col_name in df_transformed.columns:
-                df_transformed[col_name] = df_transformed[col_name].apply(clean_currency_value)
-                # No need to convert pd.isna to None here, universal conversion below will handle it.
-
-        # Date columns (for PostgreSQL DATE)
-        for col_name in ['date_joined_unicorn_club']:
-            if col_name in df_transformed.columns:
-                df_transformed[col_name] = pd.to_datetime(df_transformed[col_name], errors='coerce').dt.date
-                # No need to convert pd.isna to None here, universal conversion below will handle it.
-        
-        # Integer columns (for PostgreSQL INTEGER/SMALLINT)
-        for col_name in ['founded_year', 'investors_count']:
-            if col_name in df_transformed.columns:
-                # Use nullable integer type. pd.NA will be handled by universal conversion.
-                df_transformed[col_name] = pd.to_numeric(df_transformed[col_name], errors='coerce').astype('Int64')
-
-        # String columns (for PostgreSQL VARCHAR)
-        for col_name in ['company_name', 'industry', 'country', 'city', 'select_investors', 'financial_stage', 'deal_terms', 'portfolio_exits']:
-            if col_name in df_transformed.columns:
-                df_transformed[col_name] = df_transformed[col_name].astype(str)
-                # No need to replace 'nan' or '' here, universal conversion below will handle it.
-        
-        # --- NEW FIX: Universal conversion of all Pandas missing values (NaN, NaT, pd.NA) to Python None ---
-        # This is the most robust way to ensure psycopg2 doesn't encounter unknown types.
-        df_transformed = df_transformed.replace({np.nan: None, pd.NA: None, pd.NaT: None, '': None})
-
-        df_transformed['load_date'] = datetime.now().date()
-
-        print("\n--- Transformed Data (first 5 rows) ---")
-        print(df_transformed.head())
-        print("\n--- Transformed Data Info (check data types) ---")
-        df_transformed.info()
-
-        # --- Data Loading into PostgreSQL ---
-        print("Loading data into PostgreSQL...")
+        with open(STATE_FILE_PATH) as state_file:
+            return json.load(state_file).get('csv_mtime')
+    except (FileNotFoundError, ValueError):
+        return None
+
+def write_last_loaded_mtime(csv_mtime):
+    """
+    Records the CSV modification time of a fully successful load so an unchanged file skips the next run.
+    """
+    with open(STATE_FILE_PATH, 'w') as state_file:
+        json.dump({'csv_mtime': csv_mtime}, state_file)
+
+# --- Loading ---
+def upsert_dim_date(load_dates):
+    """
+    Inserts any new load dates into dim_date and returns a (load_date, load_date_key) frame covering all of them,
+    ready to merge onto transformed chunks.
+    One round-trip in one transaction; requires UNIQUE (full_date) on dim_date.
+    """
+    unique_dates = pd.DatetimeIndex(pd.Series(load_dates).unique())
+
+    dim_date_df = pd.DataFrame({
+        'full_date': unique_dates.date,
+        'year': unique_dates.year,
+        'month': unique_dates.month,
+        'day': unique_dates.day,
+        'day_of_week': unique_dates.weekday,
+        'is_weekday': unique_dates.weekday < 5
+    })
+
+    with db_engine.begin() as connection, connection.connection.cursor() as cur:
+        date_key_rows = execute_values(cur, SQL_UPSERT_DATE, to_db_records(dim_date_df), fetch=True)
+
+    rows_inserted_date = sum(1 for _, _, inserted in date_key_rows if inserted)
+    if rows_inserted_date:
+        print(f"Inserted {rows_inserted_date} new dates into dim_date.")
+
+    date_keys = pd.DataFrame([(full_date, date_key) for full_date, date_key, _ in date_key_rows], columns=['load_date', 'load_date_key'])
+    return date_keys.astype({'load_date_key': 'Int64'})
+
+def read_dim_company_hashes():
+    """
+    Returns dim_company's company_key and content_hash indexed by company_name, read once per cycle.
+    Requires the content_hash column from the README setup steps.
+    """
+    with db_engine.begin() as connection, connection.connection.cursor() as cur:
+        cur.execute(SQL_SELECT_COMPANY_HASHES)
+        rows = cur.fetchall()
+
+    return pd.DataFrame(rows, columns=['company_name', 'company_key', 'content_hash']).set_index('company_name')
+
+def load_unicorn_chunk(df_transformed, date_keys, company_key_map, known_companies):
+    """
+    Loads one transformed chunk into dim_company and fact_unicorn_snapshot.
+    company_key_map is shared across chunks: companies resolved by an earlier chunk are not sent again,
+    and the keys of this chunk's companies are added to it.
+    Companies whose content_hash matches known_companies (from read_dim_company_hashes) are not upserted at all.
+    Returns (rows_loaded, rows_skipped, committed) for the fact table; committed is False if a load phase failed
+    and was rolled back, while rows skipped for data-quality reasons (e.g. no company name) leave it True.
+    """
+    # Hash join on load_date; keeps load_date_key as Int64 instead of a per-row dict lookup.
+    df_transformed = df_transformed.merge(date_keys, on='load_date', how='left')
+
+    # 1. Load/Update dim_company table
+    dim_company_cols = ['company_name', 'industry', 'country', 'city', 'founded_year', 'date_joined_unicorn_club', 'select_investors']
+    # Rows without a company name cannot be keyed (UNIQUE never conflicts on NULL) and would fail the whole batch;
+    # leave them out here so their fact rows are skipped below as missing a company_key.
+    dim_company_df = df_transformed.loc[df_transformed['company_name'].notna()].reindex(columns=dim_company_cols)
+    dim_company_df = dim_company_df.drop_duplicates(subset=['company_name'])
+    dim_company_df = dim_company_df[~dim_company_df['company_name'].isin(company_key_map.keys())]
+
+    # Skip companies whose attributes are unchanged since the last load; avoids needless UPDATEs, WAL and bloat.
+    content_hash = pd.util.hash_pandas_object(dim_company_df, index=False).map('{:016x}'.format)
+    unchanged = content_hash.eq(dim_company_df['company_name'].map(known_companies['content_hash']))
+    unchanged_names = dim_company_df.loc[unchanged, 'company_name']
+    company_key_map.update(zip(unchanged_names, known_companies.loc[unchanged_names, 'company_key']))
+    dim_company_df = dim_company_df[~unchanged].assign(content_hash=content_hash[~unchanged])
+
+    rows_inserted_company = 0
+    rows_updated_company = 0
+    committed = True
+
+    if not dim_company_df.empty:
         try:
-            with db_engine.connect() as connection:
-                # 1. Load/Update dim_date table
-                unique_dates = df_transformed['load_date'].unique()
-                
-                dim_date_df = pd.DataFrame({
-                    'full_date': unique_dates,
-                    'year': [d.year for d in unique_dates],
-                    'month': [d.month for d in unique_dates],
-                    'day': [d.day for d in unique_dates],
-                    'day_of_week': [d.weekday() for d in unique_dates],
-                    'is_weekday': [d.weekday() < 5 for d in unique_dates]
-                })
-                
-                existing_date_map = {}
-                existing_dates_query = connection.execute(text("SELECT full_date, date_key FROM dim_date")).fetchall()
-                existing_date_map = {row[0]: row[1] for row in existing_dates_query}
-                
-                new_dates_to_insert = dim_date_df[~dim_date_df['full_date'].isin(existing_date_map.keys())]
-                
-                if not new_dates_to_insert.empty:
-                    new_dates_to_insert.to_sql('dim_date', connection, if_exists='append', index=False)
-                    connection.commit()
-                    print(f"Inserted {len(new_dates_to_insert)} new dates into dim_date.")
-                    
-                    new_inserted_dates_query = connection.execute(text("SELECT full_date, date_key FROM dim_date WHERE full_date IN :dates"), {'dates': tuple(new_dates_to_insert['full_date'].tolist())}).fetchall()
-                    for d, dk in new_inserted_dates_query:
-                        existing_date_map[d] = dk
-                
-                df_transformed['load_date_key'] = df_transformed['load_date'].map(existing_date_map)
-                
-                # 2. Load/Update dim_company table
-                dim_company_cols = ['company_name', 'industry', 'country', 'city', 'founded_year', 'date_joined_unicorn_club', 'select_investors']
-                dim_company_df = df_transformed[[col for col in dim_company_cols if col in df_transformed.columns]].drop_duplicates(subset=['company_name'])
-                
-                rows_inserted_company = 0
-                rows_updated_company = 0
-                
-                for index, row_data in dim_company_df.iterrows():
-                    try:
-                        connection.begin_nested()
-                        
-                        result = connection.execute(text(f"SELECT company_key FROM dim_company WHERE company_name = :company_name"), {'company_name': row_data['company_name']}).fetchone()
-                        
-                        insert_update_data = {k: row_data.get(k) for k in dim_company_cols}
-                        
-                        if result:
-                            company_key = result[0]
-                            update_sql = text("""
-                                UPDATE dim_company SET
-                                    industry = :industry,
-                                    country = :country,
-                                    city = :city,
-                                    founded_year = :founded_year,
-                                    date_joined_unicorn_club = :date_joined_unicorn_club,
-                                    select_investors = :select_investors
-                                WHERE company_name = :company_name;
-                            """)
-                            connection.execute(update_sql, insert_update_data)
-                            rows_updated_company += 1
-                        else:
-                            insert_sql = text("""
-                                INSERT INTO dim_company (company_name, industry, country, city, founded_year, date_joined_unicorn_club, select_investors)
-                                VALUES (:company_name, :industry, :country, :city, :founded_year, :date_joined_unicorn_club, :select_investors)
-                                RETURNING company_key;
-                            """)
-                            company_key = connection.execute(insert_sql, insert_update_data).scalar_one()
-                            rows_inserted_company += 1
-                        
-                        df_transformed.loc[df_transformed['company_name'] == row_data['company_name'], 'company_key'] = int(company_key)
-
-                        connection.commit()
-                        
-                    except Exception as e:
-                        connection.rollback()
-                        print(f"Error managing dim_company for {row_data['company_name']}: {e}")
-                        print(f"Problematic dim_company row data: {row_data.to_dict()}")
-                        df_transformed.loc[df_transformed['company_name'] == row_data['company_name'], 'company_key'] = None
-                connection.commit()
-                print(f"Managed dim_company: Inserted {rows_inserted_company}, Updated {rows_updated_company} records.")
-
-                # 3. Load fact_unicorn_snapshot table
-                fact_columns = ['load_date_key', 'company_key', 'valuation_billion', 'total_raised_million', 'financial_stage', 'investors_count', 'deal_terms', 'portfolio_exits']
-                df_fact = df_transformed[[col for col in fact_columns if col in df_transformed.columns]].copy()
-                
-                rows_inserted_fact = 0
-                rows_skipped_fact = 0
-                
-                for index, row_data in df_fact.iterrows():
-                    if row_data['company_key'] is None or row_data['load_date_key'] is None:
-                        print(f"Skipping fact row for company_name: {df_transformed.loc[index, 'company_name']} due to missing company_key or load_date_key.")
-                        rows_skipped_fact += 1
-                        continue
-                        
-                    row_data['company_key'] = int(row_data['company_key'])
-                    
-                    try:
-                        connection.begin_nested()
-                        
-                        insert_fact_sql = text("""
-                            INSERT INTO fact_unicorn_snapshot (load_date_key, company_key, valuation_billion, total_raised_million, financial_stage, investors_count, deal_terms, portfolio_exits)
-                            VALUES (:load_date_key, :company_key, :valuation_billion, :total_raised_million, :financial_stage, :investors_count, :deal_terms, :portfolio_exits)
-                            ON CONFLICT (load_date_key, company_key) DO UPDATE SET
-                                valuation_billion = EXCLUDED.valuation_billion,
-                                total_raised_million = EXCLUDED.total_raised_million,
-                                financial_stage = EXCLUDED.financial_stage,
-                                investors_count = EXCLUDED.investors_count,
-                                deal_terms = EXCLUDED.deal_terms,
-                                portfolio_exits = EXCLUDED.portfolio_exits;
-                        """)
-                        result = connection.execute(insert_fact_sql, row_data.to_dict())
-                        if result.rowcount > 0:
-                            rows_inserted_fact += 1
-                        else:
-                            rows_skipped_fact += 1
-                        connection.commit()
-                        
-                    except Exception as e:
-                        connection.rollback()
-                        print(f"Error inserting/updating fact row for {row_data.get('company_name')} on {row_data.get('load_date_key')}: {e}")
-                        print(f"Problematic fact row data: {row_data.to_dict()}")
-                        rows_skipped_fact += 1
-                
-                print(f"Cycle complete: Loaded {rows_inserted_fact} new/updated fact records. Skipped {rows_skipped_fact} existing records.")
-
-        except psycopg2.Error as db_err:
-            print(f"Database error during loading: {db_err}. PostgreSQL error code: {db_err.pgcode}. Retrying in next cycle.")
+            # One round-trip and one transaction for the chunk's companies; requires UNIQUE (company_name) on dim_company.
+            with db_engine.begin() as connection, connection.connection.cursor() as cur:
+                returned_rows = execute_values(cur, SQL_UPSERT_COMPANY, to_db_records(dim_company_df), page_size=1000, fetch=True)
+
+            company_key_map.update((name, key) for key, name, _ in returned_rows)
+            rows_inserted_company = sum(1 for _, _, inserted in returned_rows if inserted)
+            rows_updated_company = len(returned_rows) - rows_inserted_company
+
         except Exception as e:
-            print(f"An unexpected error occurred during database loading: {e}. Retrying in next cycle.")
+            # db_engine.begin() has already rolled the whole batch back; these companies keep no key.
+            print(f"Error managing dim_company: {e}")
+            committed = False
+    print(f"Managed dim_company: Inserted {rows_inserted_company}, Updated {rows_updated_company}, Unchanged {len(unchanged_names)} records.")
+
+    df_transformed['company_key'] = df_transformed['company_name'].map(company_key_map).astype('Int64')
+
+    # 2. Load fact_unicorn_snapshot table
+    fact_columns = ['load_date_key', 'company_key', 'valuation_billion', 'total_raised_million', 'financial_stage', 'investors_count', 'deal_terms', 'portfolio_exits']
+    df_fact = df_transformed.reindex(columns=fact_columns)
+
+    missing_keys = df_fact['company_key'].isna() | df_fact['load_date_key'].isna()
+    for company_name in df_transformed.loc[missing_keys, 'company_name']:
+        print(f"Skipping fact row for company_name: {company_name} due to missing company_key or load_date_key.")
+    rows_skipped_fact = int(missing_keys.sum())
+
+    df_fact = df_fact.dropna(subset=['company_key', 'load_date_key'])
+    # A single INSERT ... ON CONFLICT cannot touch the same key twice; keep the last row like the old row-by-row upsert did.
+    df_fact = df_fact.drop_duplicates(subset=['load_date_key', 'company_key'], keep='last')
+    df_fact = df_fact.astype({'load_date_key': int, 'company_key': int})
+
+    if df_fact.empty:
+        return 0, rows_skipped_fact, committed
+
+    try:
+        with db_engine.begin() as connection, connection.connection.cursor() as cur:
+            cur.execute(SQL_SNAPSHOT_EXISTS, (df_fact['load_date_key'].unique().tolist(),))
+            if cur.fetchone() is None:
+                # Nothing to conflict with for this snapshot yet (first chunk of a new day), so stream it in with COPY.
+                buf = io.StringIO()
+                df_fact.to_csv(buf, index=False, header=False, na_rep='\\N')
+                buf.seek(0)
+                cur.copy_expert(SQL_COPY_FACT, buf)
+                print(f"Snapshot is new: copied {len(df_fact)} fact rows.")
+            else:
+                execute_values(cur, SQL_UPSERT_FACT, to_db_records(df_fact), page_size=1000)
+        return len(df_fact), rows_skipped_fact, committed
 
     except Exception as e:
-        print(f"An unexpected error occurred in main loop: {e}. Retrying in next cycle.")
+        # db_engine.begin() has already rolled the whole batch back.
+        print(f"Error inserting/updating fact rows: {e}")
+        return 0, rows_skipped_fact + len(df_fact), False
+
+# --- Load Cycle ---
+def run_cycle():
+    """
+    Runs one extract-transform-load pass over CSV_FILE_PATH and returns.
+    The CSV is streamed in CSV_CHUNK_SIZE-row chunks, each transformed and loaded before the next is read.
+    Scheduling is left to cron / a systemd timer / Task Scheduler, so no process sits idle between loads.
+    Returns True when every load phase committed (or the CSV was unchanged), False otherwise.
+    """
+    print(f"\n--- Starting data load cycle for Unicorns at {datetime.now()} ---")
+
+    try:
+        # --- 1. Load data from CSV ---
+        csv_mtime = os.stat(CSV_FILE_PATH).st_mtime
+        if csv_mtime == read_last_loaded_mtime():
+            print(f"No changes in {CSV_FILE_PATH} since the last successful load. Skipping this cycle.")
+            return True
+
+        print(f"Loading data from {CSV_FILE_PATH} in chunks of up to {CSV_CHUNK_SIZE} rows...")
+        load_date = datetime.now().date()
+        company_key_map = {}
+        rows_read = 0
+        rows_loaded_fact = 0
+        rows_skipped_fact = 0
+        all_committed = True
+
+        date_keys = upsert_dim_date([load_date])
+        known_companies = read_dim_company_hashes()
+
+        # The pyarrow engine cannot stream, so chunks use the C parser (still with declared dtypes and Arrow-backed strings).
+        for chunk_number, df_raw in enumerate(pd.read_csv(CSV_FILE_PATH, chunksize=CSV_CHUNK_SIZE, dtype_backend='pyarrow', dtype=CSV_DTYPES), start=1):
+            # --- 2. Data Transformation ---
+            df_transformed = transform_unicorn_data(df_raw, load_date)
+            rows_read += len(df_transformed)
+
+            if chunk_number == 1:
+                print("\n--- Transformed Data (first 5 rows) ---")
+                print(df_transformed.head())
+                print("\n--- Transformed Data Info (check data types) ---")
+                df_transformed.info()
+
+            # --- 3. Data Loading into PostgreSQL ---
+            print(f"Loading chunk {chunk_number} ({len(df_transformed)} rows) into PostgreSQL...")
+            rows_loaded, rows_skipped, committed = load_unicorn_chunk(df_transformed, date_keys, company_key_map, known_companies)
+            rows_loaded_fact += rows_loaded
+            rows_skipped_fact += rows_skipped
+            all_committed = all_committed and committed
+
+        if rows_read == 0:
+            print("Error: CSV file is empty or could not be read.")
+            return False
+
+        print(f"Cycle complete: Loaded {rows_loaded_fact} new/updated fact records. Skipped {rows_skipped_fact} records.")
+        # Rows that can never load (bad data) are only logged; a rolled-back phase leaves the file due for a retry.
+        if all_committed:
+            write_last_loaded_mtime(csv_mtime)
+            return True
+        print("Some load phases failed and were rolled back. Retrying in next run.")
+
+    except psycopg2.Error as db_err:
+        print(f"Database error during loading: {db_err}. PostgreSQL error code: {db_err.pgcode}. Retrying in next run.")
+    except Exception as e:
+        print(f"An unexpected error occurred in load cycle: {e}. Retrying in next run.")
+
+    return False
 
-    print(f"Waiting for {current_wait_time} seconds before next full fetch cycle...")
-    time.sleep(current_wait_time)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(0 if run_cycle() else 1)
\ No newline at end of file